@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+"""
+Drives the public views and `subscribe()` concurrently against a seeded
+SQLite database, with confirmation emails delivered to a local SMTP sink.
+
+    python benchmarks/loadtest.py --seed 5000 --requests 5000 --threads 16
+
+Runs fully offline. Reports throughput, latency percentiles and error rates
+per operation, lock contention, and the delivery delay of confirmation emails.
+
+Lock contention is reported as the time spent in statements that take
+SQLite's write lock (BEGIN IMMEDIATE, INSERT, UPDATE, DELETE). That is the
+wait for the lock plus the write itself. Run with `--threads 1` for the
+uncontended baseline; the difference under load is lock wait.
+Writers queue for the lock with IMMEDIATE transactions, which need Django
+5.1+. On older versions transactions start deferred, and contention shows up
+mostly as "lock" errors instead of wait time.
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from smtp_sink import SMTPSink  # noqa: E402
+
+OPERATIONS = ("unsubscribe", "one_click", "confirm", "subscribe")
+LIST_NAME = "newsletter"
+WRITE_STATEMENTS = ("BEGIN", "INSERT", "UPDATE", "DELETE")
+
+
+def configure(database, smtp_port, args):
+    options = {"timeout": args.db_timeout}
+    if django.VERSION >= (5, 1):
+        # Writers wait for the lock instead of failing when a read
+        # transaction tries to upgrade to a write.
+        options["transaction_mode"] = "IMMEDIATE"
+    settings.configure(
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "emaillist",
+        ],
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": database,
+                "OPTIONS": options,
+            }
+        },
+        TEMPLATES=[
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "DIRS": [os.path.join(BENCHMARKS_DIR, "templates")],
+                "APP_DIRS": True,
+            }
+        ],
+        ROOT_URLCONF="emaillist.urls",
+        ALLOWED_HOSTS=["testserver"],
+        MIDDLEWARE=[],
+        SECRET_KEY="load-test-key",
+        WEBSITE_URL="http://testserver",
+        DEFAULT_FROM_EMAIL="loadtest@example.com",
+        EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+        EMAIL_HOST="127.0.0.1",
+        EMAIL_PORT=smtp_port,
+        RATELIMIT_ENABLE=args.ratelimit,
+        USE_TZ=True,
+    )
+    django.setup()
+
+    from django.db.backends.signals import connection_created
+
+    def enable_wal(sender, connection, **kwargs):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL;")
+
+    connection_created.connect(enable_wal, weak=False)
+
+
+def seed(count):
+    from django.core.management import call_command
+
+    from emaillist.models import Subscription
+
+    call_command("migrate", verbosity=0, skip_checks=True)
+    Subscription.objects.bulk_create(
+        [
+            Subscription(
+                email=f"confirmed{i}@example.com", list_name=LIST_NAME, is_confirmed=True
+            )
+            for i in range(count)
+        ]
+        + [
+            Subscription(email=f"pending{i}@example.com", list_name=LIST_NAME)
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+
+
+def build_tasks(args):
+    from django.urls import reverse
+
+    from emaillist.tokens import CONFIRM, UNSUBSCRIBE, make_token
+
+    weights = dict.fromkeys(OPERATIONS, 0)
+    for part in args.mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in weights:
+            raise SystemExit(f"Unknown operation {name!r}, expected one of {OPERATIONS}")
+        weights[name] = int(weight)
+
+    rng = random.Random(args.random_seed)
+    counters = defaultdict(itertools.count)
+    tasks = []
+    for op in rng.choices(list(weights), weights=list(weights.values()), k=args.requests):
+        i = next(counters[op])
+        if op == "subscribe":
+            tasks.append((op, f"new{i}@example.com"))
+            continue
+        prefix = "pending" if op == "confirm" else "confirmed"
+        email = f"{prefix}{i % args.seed}@example.com"
+        purpose = CONFIRM if op == "confirm" else UNSUBSCRIBE
+        view_name = {
+            "unsubscribe": "email_optout",
+            "one_click": "email_one_click_optout",
+            "confirm": "confirm_subscription",
+        }[op]
+        url = reverse(
+            view_name,
+            kwargs={
+                "email": email,
+                "token": make_token(email, LIST_NAME, purpose),
+                "list_name": LIST_NAME,
+            },
+        )
+        tasks.append((op, url))
+    return tasks
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Worker(threading.local):
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+
+
+def run(tasks, threads):
+    from django.db import OperationalError, connection
+
+    from emaillist.utils import subscribe
+
+    worker = Worker()
+    subscribe_started = {}
+
+    def execute(task):
+        op, target = task
+        error = None
+        lock_wait = 0.0
+
+        def time_writes(execute_sql, sql, params, many, context):
+            nonlocal lock_wait
+            if not sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+                return execute_sql(sql, params, many, context)
+            started = time.perf_counter()
+            try:
+                return execute_sql(sql, params, many, context)
+            finally:
+                lock_wait += time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(time_writes):
+                perform(op, target, started)
+        except OperationalError as e:
+            error = "lock" if "lock" in str(e).lower() else type(e).__name__
+        except HTTPError as e:
+            error = f"HTTP {e}"
+        except Exception as e:
+            error = type(e).__name__
+        finally:
+            connection.close()
+        return op, time.perf_counter() - started, lock_wait, error
+
+    def perform(op, target, started):
+        if op == "subscribe":
+            subscribe_started[target] = started
+            subscribe(target, LIST_NAME)
+            return
+        if op == "one_click":
+            response = worker.client.post(target)
+        else:
+            response = worker.client.get(target)
+        if response.status_code >= 400:
+            raise HTTPError(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(execute, tasks))
+    return results, time.perf_counter() - started, subscribe_started
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def report(results, elapsed, sink, subscribe_started):
+    by_op = defaultdict(list)
+    for op, latency, lock_wait, error in results:
+        by_op[op].append((latency, lock_wait, error))
+
+    header = (
+        f"{'operation':<12}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}{'errors':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for op in OPERATIONS:
+        rows = by_op.get(op)
+        if not rows:
+            continue
+        latencies = [latency * 1000 for latency, _, _ in rows]
+        errors = sum(1 for _, _, error in rows if error)
+        print(
+            f"{op:<12}{len(rows):>9}{len(rows) / elapsed:>9.0f}"
+            f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 90):>9.1f}"
+            f"{percentile(latencies, 99):>9.1f}{max(latencies):>9.1f}{errors:>8}"
+        )
+
+    header = (
+        f"\n{'lock wait':<12}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        f"{'% of time':>11}{'lock errors':>13}"
+    )
+    print(header)
+    print("-" * (len(header) - 1))
+    for op in OPERATIONS:
+        rows = by_op.get(op)
+        if not rows:
+            continue
+        waits = [lock_wait * 1000 for _, lock_wait, _ in rows]
+        share = sum(lock_wait for _, lock_wait, _ in rows) / sum(
+            latency for latency, _, _ in rows
+        )
+        lock_errors = sum(1 for _, _, error in rows if error == "lock")
+        print(
+            f"{op:<12}{percentile(waits, 50):>9.1f}{percentile(waits, 90):>9.1f}"
+            f"{percentile(waits, 99):>9.1f}{max(waits):>9.1f}{share:>11.1%}"
+            f"{lock_errors:>13}"
+        )
+
+    errors = defaultdict(int)
+    for _, _, _, error in results:
+        if error:
+            errors[error] += 1
+    total_errors = sum(errors.values())
+    print(
+        f"\n{len(results)} requests in {elapsed:.2f}s "
+        f"({len(results) / elapsed:.0f} req/s), "
+        f"error rate {total_errors / len(results):.2%}"
+    )
+    for error, count in sorted(errors.items()):
+        print(f"  {error}: {count}")
+
+    delays = [
+        (message["received_at"] - subscribe_started[recipient]) * 1000
+        for message in sink.messages
+        for recipient in message["recipients"]
+        if recipient in subscribe_started
+    ]
+    print(f"\nSMTP sink received {len(sink.messages)} messages")
+    if delays:
+        print(
+            f"  delivery delay ms: p50 {percentile(delays, 50):.1f}, "
+            f"p90 {percentile(delays, 90):.1f}, p99 {percentile(delays, 99):.1f}, "
+            f"max {max(delays):.1f}"
+        )
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--seed", type=positive_int, default=2000, help="Rows seeded per state."
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument(
+        "--mix",
+        default="unsubscribe=50,one_click=20,confirm=20,subscribe=10",
+        help="Relative weight of each operation.",
+    )
+    parser.add_argument("--db-timeout", type=float, default=5.0)
+    parser.add_argument(
+        "--ratelimit", action="store_true", help="Keep the views' rate limits enabled."
+    )
+    parser.add_argument("--random-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sink = SMTPSink().start()
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(os.path.join(tmp, "loadtest.sqlite3"), sink.port, args)
+        seed(args.seed)
+        tasks = build_tasks(args)
+        results, elapsed, subscribe_started = run(tasks, args.threads)
+        sink.stop()
+        report(results, elapsed, sink, subscribe_started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Compares token generation and verification throughput of `emaillist.tokens`
+with the previous `TimestampSigner` based implementation.
+
+    python benchmarks/tokens.py --count 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+django.setup()
+
+from django.core.signing import BadSignature, SignatureExpired, TimestampSigner  # noqa: E402
+
+from emaillist.tokens import UNSUBSCRIBE, check_token, make_token  # noqa: E402
+
+
+def legacy_make_token(email):
+    signer = TimestampSigner()
+    return signer.sign(email)
+
+
+def legacy_check_token(token):
+    email, token = token.split(":", 1)
+    signer = TimestampSigner()
+    key = f"{email}:{token}"
+    try:
+        signer.unsign(key, max_age=3600 * 24 * 7)
+        return True
+    except (BadSignature, SignatureExpired):
+        return False
+
+
+def timed(label, count, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<20} {count / elapsed:>12,.0f} tokens/s  ({elapsed:.3f}s)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--list-name", default="newsletter")
+    args = parser.parse_args()
+
+    emails = [f"subscriber{i}@example.com" for i in range(args.count)]
+    list_name = args.list_name
+
+    legacy_tokens = timed(
+        "legacy make", args.count, lambda: [legacy_make_token(e) for e in emails]
+    )
+    timed(
+        "legacy check", args.count, lambda: all(map(legacy_check_token, legacy_tokens))
+    )
+    tokens = timed(
+        "make",
+        args.count,
+        lambda: [make_token(e, list_name, UNSUBSCRIBE) for e in emails],
+    )
+    timed(
+        "check",
+        args.count,
+        lambda: all(
+            check_token(t, e, list_name, UNSUBSCRIBE) for t, e in zip(tokens, emails)
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
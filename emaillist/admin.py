@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Subscription
+from .models import ArchivedSubscription, Subscription
 
 
 @admin.register(Subscription)
@@ -25,3 +25,10 @@ class SubscriptionAdmin(admin.ModelAdmin):
             {"fields": ("is_subscribed", "is_unsubscribed", "is_confirmed")},
         ),
     )
+
+
+@admin.register(ArchivedSubscription)
+class ArchivedSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ("email", "list_name", "unsubscribed_at", "archived_at")
+    list_filter = ("list_name",)
+    search_fields = ("email",)
@@ -0,0 +1,138 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from emaillist.models import ArchivedSubscription, Subscription
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete guest signups that were never confirmed and move long-unsubscribed "
+        "rows into the archive table. Rows are processed in small primary key "
+        "batches with a pause between them to avoid long table locks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--unconfirmed-days",
+            type=int,
+            default=30,
+            help="Delete unconfirmed signups older than this many days (default: 30).",
+        )
+        parser.add_argument(
+            "--unsubscribed-days",
+            type=int,
+            default=365,
+            help="Archive rows unsubscribed for more than this many days (default: 365).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows handled per batch (default: 1000).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="Seconds to wait between batches (default: 0.1).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be purged or archived.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        unconfirmed_cutoff = now - timedelta(days=options["unconfirmed_days"])
+        unsubscribed_cutoff = now - timedelta(days=options["unsubscribed_days"])
+
+        # Pending guest signups only: unsubscribed rows are kept (or archived)
+        # so that an opt-out is never forgotten. User rows from before double
+        # opt-in also have is_confirmed=False and must not be touched.
+        unconfirmed = Subscription.objects.filter(
+            user__isnull=True,
+            is_confirmed=False,
+            is_subscribed=True,
+            subscribed_at__lt=unconfirmed_cutoff,
+        )
+        # Rows without `unsubscribed_at` have no known unsubscribe date and are kept.
+        unsubscribed = Subscription.objects.filter(
+            is_unsubscribed=True, unsubscribed_at__lt=unsubscribed_cutoff
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would delete {unconfirmed.count()} unconfirmed subscriptions."
+            )
+            self.stdout.write(
+                f"Would archive {unsubscribed.count()} unsubscribed subscriptions."
+            )
+            return
+
+        deleted = self._process(
+            unconfirmed, self._delete_batch, "Deleted unconfirmed", options
+        )
+        archived = self._process(
+            unsubscribed, self._archive_batch, "Archived unsubscribed", options
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} unconfirmed and archived {archived} "
+                "unsubscribed subscriptions."
+            )
+        )
+
+    def _process(self, queryset, action, label, options):
+        batch_size = options["batch_size"]
+        last_pk = 0
+        total = 0
+        started = time.monotonic()
+        while True:
+            pks = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            last_pk = pks[-1]
+            # Re-apply the filter so rows changed since the scan are left alone.
+            total += action(queryset.filter(pk__in=pks))
+
+            elapsed = time.monotonic() - started
+            rate = total / elapsed if elapsed else total
+            self.stdout.write(f"{label}: {total} rows ({rate:.0f} rows/s)")
+
+            if len(pks) < batch_size:
+                break
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+        return total
+
+    def _delete_batch(self, queryset):
+        deleted, _ = queryset.delete()
+        return deleted
+
+    def _archive_batch(self, queryset):
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update().values(
+                    "pk", "email", "list_name", "subscribed_at", "unsubscribed_at"
+                )
+            )
+            ArchivedSubscription.objects.bulk_create(
+                ArchivedSubscription(
+                    email=row["email"],
+                    list_name=row["list_name"],
+                    subscribed_at=row["subscribed_at"],
+                    unsubscribed_at=row["unsubscribed_at"],
+                )
+                for row in rows
+            )
+            Subscription.objects.filter(pk__in=[row["pk"] for row in rows]).delete()
+        return len(rows)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emaillist', '0002_subscription_is_confirmed_subscription_subscribed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('list_name', models.CharField(max_length=100)),
+                ('subscribed_at', models.DateTimeField()),
+                ('unsubscribed_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='unsubscribed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def backfill_unsubscribed_at(apps, schema_editor):
+    # The real unsubscribe date of older rows is unknown, so retention starts
+    # counting from this migration rather than from `subscribed_at`.
+    Subscription = apps.get_model("emaillist", "Subscription")
+    Subscription.objects.filter(
+        is_unsubscribed=True, unsubscribed_at__isnull=True
+    ).update(unsubscribed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emaillist', '0003_subscription_unsubscribed_at_archivedsubscription'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_unsubscribed_at, migrations.RunPython.noop),
+    ]
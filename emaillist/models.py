@@ -16,6 +16,7 @@ class Subscription(models.Model):
     is_subscribed = models.BooleanField(default=True)
     is_unsubscribed = models.BooleanField(default=False)
     subscribed_at = models.DateTimeField(auto_now_add=True)
+    unsubscribed_at = models.DateTimeField(null=True, blank=True)
     is_confirmed = models.BooleanField(default=False)  # Double opt-in for email only
 
     class Meta:
@@ -23,3 +24,19 @@ class Subscription(models.Model):
 
     def __str__(self):
         return f"{self.email} - {self.list_name}"
+
+
+class ArchivedSubscription(models.Model):
+    """
+    Compact record of an unsubscribed row moved out of `Subscription` by the
+    `purge_subscriptions` management command.
+    """
+
+    email = models.EmailField()
+    list_name = models.CharField(max_length=100)
+    subscribed_at = models.DateTimeField()
+    unsubscribed_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.email} - {self.list_name}"
@@ -0,0 +1,121 @@
+"""
+Signed tokens for the links sent to subscribers.
+
+A token is `<timestamp>:<signature>` where the signature is an HMAC over the
+email, the list name and the timestamp, keyed by a salt specific to the
+purpose of the link. The email and list name are not embedded in the token:
+they come from the URL and a token is only valid for the exact values it was
+made for.
+
+Confirmation and unsubscribe links sent before this format existed are plain
+`TimestampSigner` tokens. They are still accepted for their original 7 days;
+the fallback will be removed in the next release.
+"""
+
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.core.signing import BadSignature, Signer, TimestampSigner, base64_hmac
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.http import base36_to_int, int_to_base36
+
+CONFIRM = "confirm"
+UNSUBSCRIBE = "unsubscribe"
+PREFERENCES = "preferences"
+
+DEFAULT_MAX_AGE = {
+    CONFIRM: 3600 * 24 * 7,
+    # Unsubscribe links must keep working well after a campaign is sent.
+    UNSUBSCRIBE: 3600 * 24 * 60,
+    PREFERENCES: 3600 * 24 * 60,
+}
+
+LEGACY_PURPOSES = (CONFIRM, UNSUBSCRIBE)
+LEGACY_MAX_AGE = 3600 * 24 * 7
+
+
+@lru_cache(maxsize=None)
+def get_signer(purpose):
+    return Signer(salt=f"emaillist.{purpose}")
+
+
+@lru_cache(maxsize=None)
+def get_legacy_signer():
+    return TimestampSigner()
+
+
+@lru_cache(maxsize=None)
+def get_max_age(purpose):
+    max_age = getattr(settings, "EMAILLIST_TOKEN_MAX_AGE", {})
+    return max_age.get(purpose, DEFAULT_MAX_AGE[purpose])
+
+
+@receiver(setting_changed)
+def reset_signers(setting, **kwargs):
+    if setting in ("SECRET_KEY", "SECRET_KEY_FALLBACKS"):
+        get_signer.cache_clear()
+        get_legacy_signer.cache_clear()
+    elif setting == "EMAILLIST_TOKEN_MAX_AGE":
+        get_max_age.cache_clear()
+
+
+def _signature(signer, key, email, list_name, timestamp):
+    return base64_hmac(
+        signer.salt + "signer",
+        # Length prefixes keep the encoding unambiguous when values contain ":".
+        f"{len(email)}:{email}{len(list_name)}:{list_name}{timestamp}",
+        key,
+        algorithm=signer.algorithm,
+    )
+
+
+def make_token(email, list_name, purpose):
+    signer = get_signer(purpose)
+    timestamp = int_to_base36(int(time.time()))
+    signature = _signature(signer, signer.key, email, list_name, timestamp)
+    return f"{timestamp}:{signature}"
+
+
+def check_token(token, email, list_name, purpose):
+    if _check_signature(token, email, list_name, purpose):
+        return True
+    # Legacy tokens are `<email>:<timestamp>:<signature>`
+    return (
+        purpose in LEGACY_PURPOSES
+        and token.count(":") >= 2
+        and check_legacy_token(token, email)
+    )
+
+
+def _check_signature(token, email, list_name, purpose):
+    timestamp, _, signature = token.partition(":")
+    if not signature:
+        return False
+    try:
+        age = time.time() - base36_to_int(timestamp)
+    except ValueError:
+        return False
+    if age > get_max_age(purpose):
+        return False
+
+    signer = get_signer(purpose)
+    for key in [signer.key, *getattr(signer, "fallback_keys", ())]:
+        expected = _signature(signer, key, email, list_name, timestamp)
+        if constant_time_compare(signature, expected):
+            return True
+    return False
+
+
+def make_legacy_token(email):
+    return get_legacy_signer().sign(email)
+
+
+def check_legacy_token(token, email=None):
+    try:
+        value = get_legacy_signer().unsign(token, max_age=LEGACY_MAX_AGE)
+    except BadSignature:
+        return False
+    return email is None or value == email
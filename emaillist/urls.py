@@ -8,6 +8,16 @@ urlpatterns = [
         views.unsubscribe_view,
         name="email_optout",
     ),
+    path(
+        "unsubscribe/one-click/<str:email>/<str:token>/<str:list_name>/",
+        views.one_click_unsubscribe_view,
+        name="email_one_click_optout",
+    ),
+    path(
+        "preferences/<str:email>/<str:token>/",
+        views.preferences_view,
+        name="email_preferences",
+    ),
     path(
         "confirm/<str:email>/<str:token>/<str:list_name>/",
         views.confirm_subscription,
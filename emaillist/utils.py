@@ -1,12 +1,16 @@
+import warnings
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import EmailMultiAlternatives
-from django.core.signing import BadSignature, SignatureExpired, TimestampSigner
+from django.db.models import Case, DateTimeField, F, Value, When
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
 from .models import Subscription
+from . import tokens
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -19,7 +23,7 @@ def get_email(identifier):
 
 
 def send_confirmation_email(email, list_name):
-    token = make_token(email)
+    token = tokens.make_token(email, list_name, tokens.CONFIRM)
     confirm_url = reverse(
         "confirm_subscription",
         kwargs={"email": email, "token": token, "list_name": list_name},
@@ -68,6 +72,7 @@ def subscribe(identifier, list_name, auto_send_confirmation=True):
         defaults={
             "is_subscribed": True,
             "is_unsubscribed": False,
+            "unsubscribed_at": None,
             "user": user,
             "is_confirmed": is_confirmed,
         },
@@ -82,14 +87,53 @@ def subscribe(identifier, list_name, auto_send_confirmation=True):
 
 def unsubscribe(identifier, list_name):
     email = get_email(identifier)
-    subscription, created = Subscription.objects.update_or_create(
+    now = timezone.now()
+    subscription, created = Subscription.objects.get_or_create(
         email=email,
         list_name=list_name,
-        defaults={"is_subscribed": False, "is_unsubscribed": True},
+        defaults={
+            "is_subscribed": False,
+            "is_unsubscribed": True,
+            "unsubscribed_at": now,
+        },
     )
+    if not created:
+        # Keep the original date when the row is already unsubscribed
+        if not subscription.is_unsubscribed or subscription.unsubscribed_at is None:
+            subscription.unsubscribed_at = now
+        subscription.is_subscribed = False
+        subscription.is_unsubscribed = True
+        subscription.save(
+            update_fields=["is_subscribed", "is_unsubscribed", "unsubscribed_at"]
+        )
     return subscription
 
 
+def update_subscriptions(identifier, lists):
+    """
+    Applies `lists`, a mapping of list name to subscribed state, to the existing
+    subscriptions of an email with a single UPDATE. Lists without a subscription
+    row are ignored.
+    """
+    email = get_email(identifier)
+    subscribed = [name for name, value in lists.items() if value]
+    Subscription.objects.filter(email=email, list_name__in=list(lists)).update(
+        is_subscribed=Case(
+            When(list_name__in=subscribed, then=Value(True)), default=Value(False)
+        ),
+        is_unsubscribed=Case(
+            When(list_name__in=subscribed, then=Value(False)), default=Value(True)
+        ),
+        unsubscribed_at=Case(
+            When(list_name__in=subscribed, then=Value(None)),
+            # Keep the original date of lists that are already unsubscribed
+            When(is_unsubscribed=True, then=F("unsubscribed_at")),
+            default=Value(timezone.now()),
+            output_field=DateTimeField(),
+        ),
+    )
+
+
 def is_subscribed(identifier, list_name):
     email = get_email(identifier)
     return Subscription.objects.filter(
@@ -103,27 +147,70 @@ def is_unsubscribed(identifier, list_name):
 
 def get_unsubscribe_url(identifier, list_name):
     email = get_email(identifier)
-    token = make_token(email)
+    token = tokens.make_token(email, list_name, tokens.UNSUBSCRIBE)
     unsubscribe_url = reverse(
         "email_optout", kwargs={"email": email, "token": token, "list_name": list_name}
     )
     return f"{settings.WEBSITE_URL}{unsubscribe_url}"
 
 
+def get_one_click_unsubscribe_url(identifier, list_name):
+    email = get_email(identifier)
+    token = tokens.make_token(email, list_name, tokens.UNSUBSCRIBE)
+    unsubscribe_url = reverse(
+        "email_one_click_optout",
+        kwargs={"email": email, "token": token, "list_name": list_name},
+    )
+    return f"{settings.WEBSITE_URL}{unsubscribe_url}"
+
+
+def get_list_unsubscribe_headers(identifier, list_name):
+    """
+    Returns the RFC 8058 headers to add to a campaign email so that mail
+    providers can unsubscribe the recipient with a single POST request.
+    """
+    url = get_one_click_unsubscribe_url(identifier, list_name)
+    return {
+        "List-Unsubscribe": f"<{url}>",
+        "List-Unsubscribe-Post": "List-Unsubscribe=One-Click",
+    }
+
+
+def get_preferences_url(identifier):
+    email = get_email(identifier)
+    token = tokens.make_token(email, "", tokens.PREFERENCES)
+    preferences_url = reverse(
+        "email_preferences", kwargs={"email": email, "token": token}
+    )
+    return f"{settings.WEBSITE_URL}{preferences_url}"
+
+
 def make_token(email):
-    signer = TimestampSigner()
-    return signer.sign(email)
+    """
+    Deprecated: use `emaillist.tokens.make_token(email, list_name, purpose)`.
+    Returns a token in the old format, accepted until the next release.
+    """
+    warnings.warn(
+        "emaillist.utils.make_token() is deprecated, use "
+        "emaillist.tokens.make_token(email, list_name, purpose).",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return tokens.make_legacy_token(email)
 
 
 def check_token(token):
-    email, token = token.split(":", 1)
-    signer = TimestampSigner()
-    key = f"{email}:{token}"
-    try:
-        signer.unsign(key, max_age=3600 * 24 * 7)  # Valid for 7 days
-        return True
-    except (BadSignature, SignatureExpired):
-        return False
+    """
+    Deprecated: use `emaillist.tokens.check_token(token, email, list_name, purpose)`.
+    Only checks tokens in the old format.
+    """
+    warnings.warn(
+        "emaillist.utils.check_token() is deprecated, use "
+        "emaillist.tokens.check_token(token, email, list_name, purpose).",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return tokens.check_legacy_token(token)
 
 
 def get_list_members(list_name):
@@ -1,14 +1,21 @@
+import json
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django_ratelimit.decorators import ratelimit
 from django.utils.translation import gettext as _
 
 from .models import Subscription
 from .signals import subscription_confirmed, unsubscription_confirmed
 
-from .utils import check_token, subscribe, unsubscribe
+from .tokens import CONFIRM, PREFERENCES, UNSUBSCRIBE, check_token
+from .utils import subscribe, unsubscribe, update_subscriptions
 
 User = get_user_model()
 
@@ -22,7 +29,7 @@ def unsubscribe_view(request, email, token, list_name):
     except User.DoesNotExist:
         email = email
 
-    if not check_token(token):
+    if not check_token(token, email, list_name, UNSUBSCRIBE):
         return HttpResponse(_("Invalid or expired unsubscribe link."), status=400)
 
     # If the request is POST, means the user has clicked the "Resubscribe" btn.
@@ -44,8 +51,110 @@ def unsubscribe_view(request, email, token, list_name):
     return TemplateResponse(request, "emaillist/unsubscribed.html", {"email": email})
 
 
+def one_click_rate(group, request):
+    # Mail providers send these from a handful of IPs right after a campaign,
+    # so the per-IP limit has to be far higher than for human clicks.
+    return getattr(settings, "EMAILLIST_ONE_CLICK_RATE", "600/m")
+
+
+@csrf_exempt
+@require_POST
+@ratelimit(key="ip", rate=one_click_rate, block=True)
+def one_click_unsubscribe_view(request, email, token, list_name):
+    """
+    RFC 8058 endpoint for `List-Unsubscribe-Post` requests. Runs a single
+    UPDATE and leaves rows that are already unsubscribed untouched.
+    """
+    if not check_token(token, email, list_name, UNSUBSCRIBE):
+        return HttpResponse(status=400)
+
+    updated = Subscription.objects.filter(
+        email=email, list_name=list_name, is_unsubscribed=False
+    ).update(is_subscribed=False, is_unsubscribed=True, unsubscribed_at=timezone.now())
+    if updated:
+        unsubscription_confirmed.send(
+            sender=Subscription, email=email, list_name=list_name
+        )
+    return HttpResponse()
+
+
+def wants_json(request):
+    return "application/json" in request.headers.get("Accept", "")
+
+
+# The token in the URL is the credential, so there is no session to protect with CSRF.
+@csrf_exempt
+@ratelimit(key="ip", rate="10/m", method="POST", block=True)
+def preferences_view(request, email, token):
+    """
+    Shows every list an email belongs to and saves changes to all of them at
+    once. Reads JSON bodies, and serves JSON instead of HTML when the client
+    asks for it.
+    """
+    json_response = wants_json(request)
+
+    def error(message):
+        if json_response:
+            return JsonResponse({"error": message}, status=400)
+        return HttpResponse(message, status=400)
+
+    if not check_token(token, email, "", PREFERENCES):
+        return error(_("Invalid or expired link."))
+
+    current = dict(
+        Subscription.objects.filter(email=email).values_list(
+            "list_name", "is_subscribed"
+        )
+    )
+
+    if request.method == "POST":
+        if request.content_type == "application/json":
+            try:
+                requested = json.loads(request.body)["lists"]
+            except (ValueError, KeyError, TypeError):
+                requested = None
+            # Only real booleans: a string like "false" must never resubscribe anyone.
+            if not isinstance(requested, dict) or not all(
+                isinstance(value, bool) for value in requested.values()
+            ):
+                return error(_("Invalid request."))
+        else:
+            # Unchecked boxes are not submitted, so every list missing from the form is off.
+            checked = set(request.POST.getlist("list_name"))
+            requested = {name: name in checked for name in current}
+
+        changes = {
+            name: value
+            for name, value in requested.items()
+            if name in current and value != current[name]
+        }
+        if changes:
+            update_subscriptions(email, changes)
+            current.update(changes)
+            for list_name, value in changes.items():
+                signal = subscription_confirmed if value else unsubscription_confirmed
+                signal.send(sender=Subscription, email=email, list_name=list_name)
+
+    lists = [
+        {"list_name": name, "is_subscribed": value}
+        for name, value in sorted(current.items())
+    ]
+    if json_response:
+        return JsonResponse({"email": email, "lists": lists})
+    return TemplateResponse(
+        request,
+        "emaillist/preferences.html",
+        {
+            "email": email,
+            "token": token,
+            "lists": lists,
+            "saved": request.method == "POST",
+        },
+    )
+
+
 def confirm_subscription(request, email, token, list_name):
-    is_valid = check_token(token)
+    is_valid = check_token(token, email, list_name, CONFIRM)
     if is_valid:
         # Find the subscription and update it to be confirmed
         Subscription.objects.filter(email=email, list_name=list_name).update(
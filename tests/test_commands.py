@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from emaillist.models import ArchivedSubscription, Subscription
+from emaillist.utils import is_subscribed, subscribe, unsubscribe
+
+User = get_user_model()
+
+
+class PurgeSubscriptionsTests(TestCase):
+
+    def setUp(self):
+        old = timezone.now() - timedelta(days=400)
+
+        # Stale guest signup that was never confirmed
+        subscribe("stale@example.com", "test_list", auto_send_confirmation=False)
+        # Recent guest signup that is still waiting for confirmation
+        subscribe("pending@example.com", "test_list", auto_send_confirmation=False)
+        # Confirmed subscriber
+        subscribe("confirmed@example.com", "test_list", auto_send_confirmation=False)
+        Subscription.objects.filter(email="confirmed@example.com").update(
+            is_confirmed=True
+        )
+        # Long-unsubscribed and recently unsubscribed rows
+        unsubscribe("gone@example.com", "test_list")
+        unsubscribe("recent@example.com", "test_list")
+
+        Subscription.objects.filter(
+            email__in=["stale@example.com", "confirmed@example.com", "gone@example.com"]
+        ).update(subscribed_at=old)
+        Subscription.objects.filter(email="gone@example.com").update(
+            unsubscribed_at=old
+        )
+
+    def call(self, *args):
+        out = StringIO()
+        call_command("purge_subscriptions", "--sleep", "0", *args, stdout=out)
+        return out.getvalue()
+
+    def remaining_emails(self):
+        return set(Subscription.objects.values_list("email", flat=True))
+
+    def test_purge_and_archive(self):
+        self.call()
+
+        self.assertEqual(
+            self.remaining_emails(),
+            {"pending@example.com", "confirmed@example.com", "recent@example.com"},
+        )
+        archived = ArchivedSubscription.objects.get()
+        self.assertEqual(archived.email, "gone@example.com")
+        self.assertEqual(archived.list_name, "test_list")
+
+    def test_dry_run_changes_nothing(self):
+        output = self.call("--dry-run")
+
+        self.assertIn("Would delete 1 unconfirmed", output)
+        self.assertIn("Would archive 1 unsubscribed", output)
+        self.assertEqual(Subscription.objects.count(), 5)
+        self.assertFalse(ArchivedSubscription.objects.exists())
+
+    def test_small_batches(self):
+        for i in range(5):
+            subscribe(f"stale{i}@example.com", "other_list", auto_send_confirmation=False)
+        Subscription.objects.filter(email__startswith="stale").update(
+            subscribed_at=timezone.now() - timedelta(days=60)
+        )
+
+        output = self.call("--batch-size", "2")
+
+        self.assertFalse(Subscription.objects.filter(email__startswith="stale").exists())
+        self.assertIn("Deleted unconfirmed: 6 rows", output)
+
+    def test_unknown_unsubscribe_date_is_kept(self):
+        # Rows from before `unsubscribed_at` existed must not be archived by age
+        Subscription.objects.filter(email="gone@example.com").update(unsubscribed_at=None)
+
+        self.call()
+
+        self.assertIn("gone@example.com", self.remaining_emails())
+        self.assertFalse(ArchivedSubscription.objects.exists())
+
+    def test_unconfirmed_user_row_is_kept(self):
+        # User rows created before double opt-in existed have is_confirmed=False
+        user = User.objects.create_user(
+            username="legacy", email="legacy@example.com", password="password"
+        )
+        subscribe(user, "test_list")
+        Subscription.objects.filter(user=user).update(
+            is_confirmed=False, subscribed_at=timezone.now() - timedelta(days=400)
+        )
+
+        self.call()
+
+        self.assertTrue(is_subscribed(user, "test_list"))
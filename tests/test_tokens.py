@@ -0,0 +1,80 @@
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from emaillist import utils
+from emaillist.tokens import (
+    CONFIRM,
+    PREFERENCES,
+    UNSUBSCRIBE,
+    check_token,
+    make_legacy_token,
+    make_token,
+)
+
+
+class TokenTests(TestCase):
+
+    def test_valid_token(self):
+        token = make_token("test@example.com", "test_list", UNSUBSCRIBE)
+        self.assertTrue(check_token(token, "test@example.com", "test_list", UNSUBSCRIBE))
+
+    def test_token_bound_to_email_list_and_purpose(self):
+        token = make_token("test@example.com", "test_list", UNSUBSCRIBE)
+        self.assertFalse(check_token(token, "other@example.com", "test_list", UNSUBSCRIBE))
+        self.assertFalse(check_token(token, "test@example.com", "other_list", UNSUBSCRIBE))
+        self.assertFalse(check_token(token, "test@example.com", "test_list", CONFIRM))
+
+    def test_malformed_token(self):
+        for token in ("", "abc", "abc:", "!!:signature", "zzzzzzzzzzzzzz:signature"):
+            self.assertFalse(check_token(token, "test@example.com", "test_list", CONFIRM))
+
+    def test_expired_token(self):
+        token = make_token("test@example.com", "test_list", CONFIRM)
+        eight_days_later = time.time() + 3600 * 24 * 8
+        with patch("emaillist.tokens.time.time", return_value=eight_days_later):
+            self.assertFalse(check_token(token, "test@example.com", "test_list", CONFIRM))
+            # Unsubscribe links live longer than confirmation links
+            token = make_token("test@example.com", "test_list", UNSUBSCRIBE)
+        self.assertTrue(check_token(token, "test@example.com", "test_list", UNSUBSCRIBE))
+
+    @override_settings(EMAILLIST_TOKEN_MAX_AGE={PREFERENCES: -1})
+    def test_max_age_setting(self):
+        token = make_token("test@example.com", "", PREFERENCES)
+        self.assertFalse(check_token(token, "test@example.com", "", PREFERENCES))
+
+    def test_secret_key_fallbacks(self):
+        token = make_token("test@example.com", "test_list", CONFIRM)
+        with override_settings(
+            SECRET_KEY="new-key-for-testing",
+            SECRET_KEY_FALLBACKS=["fake-key-for-testing"],
+        ):
+            self.assertTrue(check_token(token, "test@example.com", "test_list", CONFIRM))
+        with override_settings(SECRET_KEY="new-key-for-testing"):
+            self.assertFalse(check_token(token, "test@example.com", "test_list", CONFIRM))
+
+    def test_fields_cannot_be_shifted(self):
+        token = make_token("x@example.com", "a:b", UNSUBSCRIBE)
+        self.assertTrue(check_token(token, "x@example.com", "a:b", UNSUBSCRIBE))
+        self.assertFalse(check_token(token, "x@example.com:a", "b", UNSUBSCRIBE))
+
+    def test_legacy_token(self):
+        token = make_legacy_token("test@example.com")
+        self.assertTrue(check_token(token, "test@example.com", "test_list", CONFIRM))
+        self.assertTrue(check_token(token, "test@example.com", "test_list", UNSUBSCRIBE))
+        self.assertFalse(check_token(token, "other@example.com", "test_list", UNSUBSCRIBE))
+        self.assertFalse(check_token(token, "test@example.com", "", PREFERENCES))
+
+    def test_legacy_token_expires_after_seven_days(self):
+        token = make_legacy_token("test@example.com")
+        eight_days_later = time.time() + 3600 * 24 * 8
+        with patch("django.core.signing.time.time", return_value=eight_days_later):
+            self.assertFalse(check_token(token, "test@example.com", "test_list", UNSUBSCRIBE))
+
+    def test_deprecated_utils_wrappers(self):
+        with self.assertWarns(DeprecationWarning):
+            token = utils.make_token("test@example.com")
+        with self.assertWarns(DeprecationWarning):
+            self.assertTrue(utils.check_token(token))
+        self.assertTrue(check_token(token, "test@example.com", "test_list", UNSUBSCRIBE))
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.test import TestCase, override_settings
 from django.core import mail
 from django.contrib.auth import get_user_model
@@ -18,8 +20,9 @@ from emaillist.utils import (
     get_non_user_list_members,
     send_confirmation_email,
     get_unsubscribe_url,
-    make_token,
+    update_subscriptions,
 )
+from emaillist.tokens import UNSUBSCRIBE, make_token
 
 User = get_user_model()
 
@@ -248,7 +251,7 @@ class SubscriptionTests(TestCase):
         self.assertEqual(subscription.user, self.user)
         
         # 2. Generate token for unsubscribe URL
-        token = make_token(self.user.email)
+        token = make_token(self.user.email, list_name, UNSUBSCRIBE)
         
         # 3. Unsubscribe the user directly rather than using the view
         unsubscribe(self.user, list_name)
@@ -342,3 +345,41 @@ class SubscriptionTests(TestCase):
         
         # 6. Verify that no confirmation email was sent
         self.assertEqual(len(mail.outbox), 1)  # Only the initial subscription email
+
+    def test_resubscribe_clears_unsubscribed_at(self):
+        # Resubscribing resets the unsubscribe date
+        unsubscribe("test@example.com", "test_list")
+        subscription = subscribe("test@example.com", "test_list", auto_send_confirmation=False)
+        self.assertIsNone(subscription.unsubscribed_at)
+
+    def test_unsubscribe_keeps_original_date(self):
+        # Unsubscribing again must not reset the date used by purge_subscriptions
+        first = unsubscribe("test@example.com", "test_list")
+        Subscription.objects.filter(pk=first.pk).update(
+            unsubscribed_at=first.unsubscribed_at - timedelta(days=30)
+        )
+        original = Subscription.objects.get(pk=first.pk).unsubscribed_at
+
+        unsubscribe("test@example.com", "test_list")
+
+        self.assertEqual(Subscription.objects.get(pk=first.pk).unsubscribed_at, original)
+
+    def test_update_subscriptions(self):
+        # Several lists are changed at once, keeping existing unsubscribe dates
+        for list_name in ("list1", "list2", "list3"):
+            subscribe(self.user, list_name)
+        old = unsubscribe(self.user, "list3")
+        Subscription.objects.filter(pk=old.pk).update(
+            unsubscribed_at=old.unsubscribed_at - timedelta(days=30)
+        )
+        original = Subscription.objects.get(pk=old.pk).unsubscribed_at
+
+        update_subscriptions(self.user, {"list1": False, "list2": True, "list3": False})
+
+        self.assertFalse(is_subscribed(self.user, "list1"))
+        self.assertTrue(is_subscribed(self.user, "list2"))
+        self.assertFalse(is_subscribed(self.user, "list3"))
+        self.assertIsNotNone(
+            Subscription.objects.get(email=self.user.email, list_name="list1").unsubscribed_at
+        )
+        self.assertEqual(Subscription.objects.get(pk=old.pk).unsubscribed_at, original)
@@ -0,0 +1,312 @@
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from emaillist.models import Subscription
+from emaillist.signals import subscription_confirmed, unsubscription_confirmed
+from emaillist.tokens import (
+    CONFIRM,
+    PREFERENCES,
+    UNSUBSCRIBE,
+    make_legacy_token,
+    make_token,
+)
+from emaillist.utils import (
+    get_list_unsubscribe_headers,
+    get_preferences_url,
+    subscribe,
+    unsubscribe,
+)
+
+
+class TokenBindingViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        subscribe("victim@example.com", "test_list", auto_send_confirmation=False)
+        subscribe("victim@example.com", "other_list", auto_send_confirmation=False)
+
+    def url(self, view_name, email, token, list_name="test_list"):
+        return reverse(
+            view_name, kwargs={"email": email, "token": token, "list_name": list_name}
+        )
+
+    @patch("django.template.response.TemplateResponse.render")
+    def test_confirm_checks_email(self, mock_render):
+        mock_render.return_value = HttpResponse("Mocked response")
+        token = make_token("attacker@example.com", "test_list", CONFIRM)
+
+        self.client.get(self.url("confirm_subscription", "victim@example.com", token))
+
+        self.assertFalse(
+            Subscription.objects.filter(email="victim@example.com", is_confirmed=True).exists()
+        )
+
+    def test_unsubscribe_checks_email(self):
+        token = make_token("attacker@example.com", "test_list", UNSUBSCRIBE)
+
+        response = self.client.get(self.url("email_optout", "victim@example.com", token))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(
+            Subscription.objects.filter(email="victim@example.com", is_unsubscribed=True).exists()
+        )
+
+    def test_unsubscribe_checks_list(self):
+        token = make_token("victim@example.com", "test_list", UNSUBSCRIBE)
+
+        response = self.client.get(
+            self.url("email_optout", "victim@example.com", token, "other_list")
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(
+            Subscription.objects.filter(email="victim@example.com", is_unsubscribed=True).exists()
+        )
+
+    @patch("django.template.response.TemplateResponse.render")
+    def test_unsubscribe_accepts_legacy_token(self, mock_render):
+        mock_render.return_value = HttpResponse("Mocked response")
+        token = make_legacy_token("victim@example.com")
+
+        response = self.client.get(self.url("email_optout", "victim@example.com", token))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            Subscription.objects.get(
+                email="victim@example.com", list_name="test_list"
+            ).is_unsubscribed
+        )
+
+
+class OneClickUnsubscribeTests(TestCase):
+
+    def setUp(self):
+        self.email = "nonuser@example.com"
+        self.list_name = "test_list"
+        subscribe(self.email, self.list_name, auto_send_confirmation=False)
+        self.url = reverse(
+            "email_one_click_optout",
+            kwargs={
+                "email": self.email,
+                "token": make_token(self.email, self.list_name, UNSUBSCRIBE),
+                "list_name": self.list_name,
+            },
+        )
+        self.signals = []
+        unsubscription_confirmed.connect(self.record_signal)
+
+    def tearDown(self):
+        unsubscription_confirmed.disconnect(self.record_signal)
+
+    def record_signal(self, sender, email, list_name, **kwargs):
+        self.signals.append((email, list_name))
+
+    def post(self, url=None):
+        return self.client.post(
+            url or self.url, {"List-Unsubscribe": "One-Click"}
+        )
+
+    def test_unsubscribes_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.post()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        subscription = Subscription.objects.get(email=self.email)
+        self.assertFalse(subscription.is_subscribed)
+        self.assertTrue(subscription.is_unsubscribed)
+        self.assertIsNotNone(subscription.unsubscribed_at)
+        self.assertEqual(self.signals, [(self.email, self.list_name)])
+
+    def test_already_unsubscribed_is_not_written(self):
+        unsubscribe(self.email, self.list_name)
+        unsubscribed_at = Subscription.objects.get(email=self.email).unsubscribed_at
+
+        with self.assertNumQueries(1):
+            response = self.post()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Subscription.objects.get(email=self.email).unsubscribed_at, unsubscribed_at
+        )
+        self.assertEqual(self.signals, [])
+
+    def test_token_bound_to_list(self):
+        subscribe(self.email, "other_list", auto_send_confirmation=False)
+        url = reverse(
+            "email_one_click_optout",
+            kwargs={
+                "email": self.email,
+                "token": make_token(self.email, self.list_name, UNSUBSCRIBE),
+                "list_name": "other_list",
+            },
+        )
+
+        with self.assertNumQueries(0):
+            response = self.post(url)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(
+            Subscription.objects.get(email=self.email, list_name="other_list").is_subscribed
+        )
+
+    def test_get_not_allowed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+        self.assertTrue(Subscription.objects.get(email=self.email).is_subscribed)
+
+    @override_settings(EMAILLIST_ONE_CLICK_RATE="2/m")
+    def test_rate_limit_setting(self):
+        self.post()
+        self.post()
+        response = self.post()
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_unsubscribe_headers(self):
+        headers = get_list_unsubscribe_headers(self.email, self.list_name)
+        self.assertEqual(
+            headers["List-Unsubscribe"], f"<http://example.com{self.url}>"
+        )
+        self.assertEqual(
+            headers["List-Unsubscribe-Post"], "List-Unsubscribe=One-Click"
+        )
+
+
+class PreferencesViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.email = "nonuser@example.com"
+        for list_name in ("list1", "list2", "list3"):
+            subscribe(self.email, list_name, auto_send_confirmation=False)
+        unsubscribe(self.email, "list3")
+        subscribe("other@example.com", "list1", auto_send_confirmation=False)
+        self.url = reverse(
+            "email_preferences",
+            kwargs={"email": self.email, "token": make_token(self.email, "", PREFERENCES)},
+        )
+        self.signals = []
+        subscription_confirmed.connect(self.record_subscribed)
+        unsubscription_confirmed.connect(self.record_unsubscribed)
+
+    def tearDown(self):
+        subscription_confirmed.disconnect(self.record_subscribed)
+        unsubscription_confirmed.disconnect(self.record_unsubscribed)
+
+    def record_subscribed(self, sender, email, list_name, **kwargs):
+        self.signals.append(("subscribed", list_name))
+
+    def record_unsubscribed(self, sender, email, list_name, **kwargs):
+        self.signals.append(("unsubscribed", list_name))
+
+    def subscribed_lists(self, email=None):
+        return set(
+            Subscription.objects.filter(
+                email=email or self.email, is_subscribed=True
+            ).values_list("list_name", flat=True)
+        )
+
+    def post_json(self, data):
+        return self.client.post(
+            self.url,
+            json.dumps(data),
+            content_type="application/json",
+            HTTP_ACCEPT="application/json",
+        )
+
+    def test_get_json(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_ACCEPT="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "email": self.email,
+                "lists": [
+                    {"list_name": "list1", "is_subscribed": True},
+                    {"list_name": "list2", "is_subscribed": True},
+                    {"list_name": "list3", "is_subscribed": False},
+                ],
+            },
+        )
+
+    def test_post_json_updates_all_lists_at_once(self):
+        with self.assertNumQueries(2):
+            response = self.post_json(
+                {"lists": {"list1": False, "list2": True, "list3": True}}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.subscribed_lists(), {"list2", "list3"})
+        self.assertEqual(self.subscribed_lists("other@example.com"), {"list1"})
+        self.assertEqual(
+            sorted(self.signals), [("subscribed", "list3"), ("unsubscribed", "list1")]
+        )
+        subscription = Subscription.objects.get(email=self.email, list_name="list1")
+        self.assertTrue(subscription.is_unsubscribed)
+        self.assertIsNotNone(subscription.unsubscribed_at)
+
+    def test_post_json_ignores_unknown_lists(self):
+        response = self.post_json({"lists": {"unknown": True}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Subscription.objects.filter(list_name="unknown").exists())
+        self.assertEqual(self.signals, [])
+
+    def test_post_json_invalid_body(self):
+        response = self.post_json(["list1"])
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_json_rejects_non_boolean_values(self):
+        for value in ("false", "0", [0], 0, None):
+            response = self.post_json({"lists": {"list1": False, "list3": value}})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(self.subscribed_lists(), {"list1", "list2"})
+        self.assertEqual(self.signals, [])
+
+    def test_post_form_accepting_json(self):
+        response = self.client.post(
+            self.url, {"list_name": ["list3"]}, HTTP_ACCEPT="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.subscribed_lists(), {"list3"})
+        self.assertEqual(
+            response.json()["lists"],
+            [
+                {"list_name": "list1", "is_subscribed": False},
+                {"list_name": "list2", "is_subscribed": False},
+                {"list_name": "list3", "is_subscribed": True},
+            ],
+        )
+
+    @patch("django.template.response.TemplateResponse.render")
+    def test_post_form(self, mock_render):
+        mock_render.return_value = HttpResponse("Mocked response")
+
+        response = self.client.post(self.url, {"list_name": ["list3"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.subscribed_lists(), {"list3"})
+        self.assertEqual(len(self.signals), 3)
+
+    def test_invalid_token(self):
+        url = reverse(
+            "email_preferences",
+            kwargs={
+                "email": self.email,
+                "token": make_token("other@example.com", "", PREFERENCES),
+            },
+        )
+        response = self.client.get(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_preferences_url(self):
+        self.assertEqual(get_preferences_url(self.email), f"http://example.com{self.url}")